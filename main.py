@@ -25,40 +25,88 @@ import ephem
 from ephem import degree
 
 import logging
+import logging.handlers
 import logzero
 from logzero import logger
 import csv
+import math
+from operator import itemgetter
+import atexit
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 #-------------------------------#
 
+#Pick the values out of the dictionaries returned by the Sense Hat
+roll_pitch_yaw = itemgetter('roll', 'pitch', 'yaw')
+xyz = itemgetter('x', 'y', 'z')
+
+def sun_altitude(lat, lon, time): 
+    '''
+    Calculates the altitude of the Sun (in degrees) in the region where 
+    the ISS is according to its location (in degrees) and UTC time.
+
+    It uses NOAA's closed-form solar declination and equation of time formulas,
+    instead of running a full pyephem computation.
+    Compared with pyephem the altitude is off by about a quarter of a degree at most,
+    which is plenty for a day / night decision.
+
+    Code attribution: 1. https://gis.stackexchange.com/questions/270764/calculate-if-day-night-time-for-point-dataset
+                      2. https://gml.noaa.gov/grad/solcalc/solareqns.PDF
+    '''
+    day_of_year = time.timetuple().tm_yday
+    utc_hours = time.hour + time.minute / 60 + time.second / 3600
+
+    #Fractional year (in radians)
+    year = 2 * math.pi / 365 * (day_of_year - 1 + (utc_hours - 12) / 24)
+
+    #Declination of the Sun (in radians) and equation of time (in minutes)
+    declination = (0.006918 - 0.399912 * math.cos(year) + 0.070257 * math.sin(year)
+                   - 0.006758 * math.cos(2 * year) + 0.000907 * math.sin(2 * year)
+                   - 0.002697 * math.cos(3 * year) + 0.00148 * math.sin(3 * year))
+    equation_of_time = 229.18 * (0.000075 + 0.001868 * math.cos(year) - 0.032077 * math.sin(year)
+                                 - 0.014615 * math.cos(2 * year) - 0.040849 * math.sin(2 * year))
+
+    #Hour angle of the ISS location - The Sun moves 15 degrees an hour, or 1 degree every 4 minutes
+    hour_angle = math.radians((utc_hours - 12) * 15 + lon + equation_of_time / 4)
+
+    lat = math.radians(lat)
+    sin_altitude = (math.sin(lat) * math.sin(declination)
+                    + math.cos(lat) * math.cos(declination) * math.cos(hour_angle))
+
+    return math.degrees(math.asin(sin_altitude))
+
 def is_the_sun_up(lat, lon, time): 
     '''
     Calculates if it's day or night in the region where 
-    the ISS is according to its location and time.
+    the ISS is according to its location (in degrees) and UTC time.
 
-    Using pyephem library, it creates an Observer standing at the location where ISS is,
-    and then checks the altitute of the Sun. If it is above surface, then it is day, else night.
+    If the Sun is above the horizon (-0.34 degrees, to allow for refraction) then it is day, else night.
 
-    Code attribution: 1. https://gis.stackexchange.com/questions/270764/calculate-if-day-night-time-for-point-dataset
-                      2. https://rhodesmill.org/pyephem/quick.htm
+    The ISS only crosses from day to night about 16 times during the program,
+    so the answer is reused for up to a minute, unless the Sun was close to the horizon last time.
+    The ISS moves about 4 degrees a minute, so the Sun can't cross the horizon in between.
     '''
-    iss_observer = ephem.Observer()
-    iss_observer.pressure = 0
-    iss_observer.horizon = "-0.34"
+    global last_day_check, last_day, last_sun_altitude
+
+    if (last_day_check is not None
+            and (time - last_day_check).total_seconds() <= 60
+            and abs(last_sun_altitude - sun_horizon) > 4):
+        return last_day
 
-    iss_observer.long = lon
-    iss_observer.lat = lat
-    iss_observer.date = time
+    last_sun_altitude = sun_altitude(lat, lon, time)
+    last_day_check = time
 
-    sun = ephem.Sun()
-    sun.compute(iss_observer)
+    # If the sun is above the horizon it's day
+    # If the sun is below the horizon it's night
+    last_day = last_sun_altitude > sun_horizon
 
-    # If sun.alt > 0 => The sun is above the horizon so it's day
-    # If sun.alt < 0 => The sun is below the horizon so it's night
-    return sun.alt > 0 
+    return last_day
 
 def photo_capture_delay(day):
     '''
+    Returns the time (in seconds) until the next photo.
     This function sets a slower caprute rythm if it's night because the photos 
     could be totaly dark and non-viable for processing.
     This helps us achieve a greater density of useful data in the used memory 
@@ -66,82 +114,123 @@ def photo_capture_delay(day):
 
     After conducting some experiments we concluded that 
     a good photo size to assume for the day is 3077 KB,
-    and during the night 1000 KB.
+    and during the night 1000 KB, at jpeg quality 100.
+    The photos are now taken at quality 85, which roughly halves them,
+    so we assume 1540 KB for the day and 500 KB for the night.
     We used those numbers to calculate the capture rates 
     which we are using, in order to get as many photos as possible
     while not exceeding the memory space.
 
     The program runs for a total of 180 minutes, 90 minutes in the day and 90 minutes at night, or 5.400s each.
-    We take a photo every 7 seconds in the day (~771 day-photos) and 20 seconds in the night (~270 night-photos).
-    So the photos will take up approximately 771*3077 + 270*1000 = 2,642,367 KB ~ 2.6 GB < 3 GB
+    We take a photo every 5 seconds in the day (~1080 day-photos) and 15 seconds in the night (~360 night-photos).
+    So the photos will take up approximately 1080*1540 + 360*500 = 1,843,200 KB ~ 1.8 GB < 3 GB
 
     The remaining memory space is sufficient enough for our log and CSV files and any photos larger than predicted. 
     '''
     if day == True:
-        delay = 7
+        delay = 5
 
     else:    
-        delay = 20
+        delay = 15
+
+    return delay
+
+def exif_dms(angle):
+    '''
+    Turns an angle in radians into the degrees/minutes/seconds string used by the GPS exif tags.
+    The numbers are worked out directly instead of parsing str(angle), and the sign is dropped
+    as it goes in the Ref tag.
+    '''
+    deg_total = abs(angle) / degree
+    degrees = int(deg_total)
+
+    min_total = (deg_total - degrees) * 60
+    minutes = int(min_total)
+
+    seconds = (min_total - minutes) * 60
 
-    logger.info("Delay till next photo %s", delay)
-    sleep(delay)
+    return '%d/1,%d/1,%d/10' % (degrees, minutes, seconds*10)
 
-def write_photo_metadata():
+def write_photo_metadata(sublong, sublat):
     '''
-    Adds the longitude and latitude as GPS exif details to the photo's metadata, analysis at a later date.
+    Adds the longitude and latitude (in radians) of the ISS as GPS exif details to the photo's metadata, analysis at a later date.
+
+    The tags are kept in photo_exif_tags and handed to the camera by the capture thread,
+    so the next photo's tags can be written while the previous one is still being captured.
     '''
-    global camera
 
     try:
         #Longitude exif data
-        lon = [float(i) for i in str(iss.sublong).split(":")]
-
-        if lon[0] < 0:
+        lon = float(sublong)
 
-            lon[0] = abs(lon[0])
-            camera.exif_tags['GPS.GPSLongitudeRef'] = "W"
+        if lon < 0:
+            photo_exif_tags['GPS.GPSLongitudeRef'] = "W"
 
         else:
-            camera.exif_tags['GPS.GPSLongitudeRef'] = "E"
+            photo_exif_tags['GPS.GPSLongitudeRef'] = "E"
 
-        camera.exif_tags['GPS.GPSLongitude'] = '%d/1,%d/1,%d/10' % (lon[0], lon[1], lon[2]*10)
+        photo_exif_tags['GPS.GPSLongitude'] = exif_dms(lon)
 
         #Latitude exif data
-        lat = [float(i) for i in str(iss.sublat).split(":")]
+        lat = float(sublat)
 
-        if lat[0] < 0:
-
-            lat[0] = abs(lat[0])
-            camera.exif_tags['GPS.GPSLatitudeRef'] = "S"
+        if lat < 0:
+            photo_exif_tags['GPS.GPSLatitudeRef'] = "S"
 
         else:
-            camera.exif_tags['GPS.GPSLatitudeRef'] = "N"
+            photo_exif_tags['GPS.GPSLatitudeRef'] = "N"
 
-        camera.exif_tags['GPS.GPSLatitude'] = '%d/1,%d/1,%d/10' % (lat[0], lat[1], lat[2]*10) 
+        photo_exif_tags['GPS.GPSLatitude'] = exif_dms(lat)
 
-    except Exception as e:
-        logger.error('{}: {})'.format(e.__class__.__name__, e))
-        logger.error("Error: " + str(e))   
+    except Exception:
+        logger.exception("Could not write the photo metadata")
 
-def write_photo(photo_num):
+def capture_photos():
     '''
-    captures current photo to disk using provided filename number
+    Runs in a background thread and captures the photos queued by write_photo.
+    The camera encodes the JPEG without holding the GIL, so the main loop keeps
+    working on ephem and Sense Hat data in the meantime.
     '''
-    global camera
+    while True:
+        photo_file, exif_tags = capture_queue.get()
 
-    #Turns the photo number into a string so as to fit in the filename of the photo
-    photo_num_str = str(photo_num)
+        #If the capture fails it is tried once more before moving on to the next photo
+        for attempt in range(2):
+            try:
+                camera.exif_tags.update(exif_tags)
 
+                #jpeg quality: Sets the compression of the image - Auto is 85/100 - 100 is lossless but
+                #takes about twice as long to encode and write, with no visible gain for our analysis
+                #The file is opened unbuffered, so the JPEG goes from the camera's buffers straight
+                #to the SD card instead of being copied through another 64K buffer first
+                with open(photo_file, 'wb', buffering=0) as file:
+                    camera.capture(file, "jpeg", quality = 85)
+
+                #Saves info to the log file
+                logger.info("captured photo using file %s", photo_file)
+                break
+
+            except Exception:
+                logger.exception("Could not capture photo %s", photo_file)
+
+        capture_queue.task_done()
+
+def write_photo(photo_num):
+    '''
+    queues current photo to be captured to disk using provided filename number
+    '''
     #Saves info to the log file
     logger.info("Capturing photo number: %s", photo_num)
 
-    #Takes photo with Izzy's camera 
-    #jpeg quality: Sets the compression of the image - Auto is 85/100 - set to 100 => The photo is lossless
-    photo_file = path + "/image_"+ photo_num_str.zfill(3) + ".jpg"
-    camera.capture(photo_file, "jpeg", quality = 100)
+    #The name is worked out here if there are more photos than expected (e.g. after errors)
+    if photo_num < len(photo_files):
+        photo_file = photo_files[photo_num]
 
-    #Saves info to the log file
-    logger.info("captured photo using file %s", photo_file)
+    else:
+        photo_file = path + "/image_" + str(photo_num).zfill(3) + ".jpg"
+
+    #Hands the photo to the capture thread with a copy of the current exif tags
+    capture_queue.put((photo_file, dict(photo_exif_tags)))
 
 
 
@@ -153,86 +242,41 @@ def collect_sensehat_data(datetime_now, day, lontitude, latitude, photo_num):
     They are not really needed for our experiement but we collect them in case that these prove useful, or that they prove useful
     as a data set to somebody else.
     '''
+    #Set before reading the Sense Hat, so the row below can still be built if the first read fails
+    temperature = 0
+
     try:
         temperature = sense.get_temperature()
         humidity = sense.get_humidity()
         pressure = sense.get_pressure()
 
-        orientation_rad = sense.get_orientation_radians()
-        roll_rad = orientation_rad['roll']
-        pitch_rad = orientation_rad['pitch']
-        yaw_rad = orientation_rad['yaw']
-
-        orientation_degrees = sense.get_orientation_degrees()
-        roll_deg = orientation_degrees['roll']
-        pitch_deg = orientation_degrees['pitch']
-        yaw_deg = orientation_degrees['yaw']
-
-        orientation = sense.get_orientation()
-        roll_orientation = orientation['roll']
-        pitch_orientation = orientation['pitch']
-        yaw_orientation = orientation['yaw']
-
-        compass_raw = sense.get_compass_raw()
-        x_compass_raw = compass_raw['x']
-        y_compass_raw = compass_raw['y']
-        z_compass_raw = compass_raw['z']
-
-        gyro_only = sense.get_gyroscope()
-        roll_gyro_only = gyro_only['roll']
-        pitch_gyro_only = gyro_only['pitch']
-        yaw_gyro_only = gyro_only['yaw']
-
-        gyro_raw = sense.get_gyroscope_raw()
-        x_gyro_raw = gyro_raw['x']
-        y_gyro_raw = gyro_raw['y']
-        z_gyro_raw = gyro_raw['z']
-
-        accel_only = sense.get_accelerometer()
-        roll_accel_only = accel_only['roll']
-        pitch_accel_only = accel_only['pitch']
-        yaw_accel_only = accel_only['yaw']
-
-        accel_raw = sense.get_accelerometer_raw()
-        x_accel_raw = accel_raw['x']
-        y_accel_raw = accel_raw['y']
-        z_accel_raw = accel_raw['z']
-
-        calculations = (datetime_now, day, lontitude, latitude, photo_num, temperature, 
-                    humidity, 
-                    pressure, 
-                    roll_rad, 
-                    pitch_rad, 
-                    yaw_rad, 
-                    roll_deg,
-                    pitch_deg, 
-                    yaw_deg, 
-                    roll_orientation, 
-                    pitch_orientation, 
-                    yaw_orientation, 
-                    x_compass_raw, 
-                    y_compass_raw, 
-                    z_compass_raw, 
-                    roll_gyro_only, 
-                    pitch_gyro_only, 
-                    yaw_gyro_only,
-                    x_gyro_raw, 
-                    y_gyro_raw, 
-                    z_gyro_raw, 
-                    roll_accel_only, 
-                    pitch_accel_only, 
-                    yaw_accel_only, 
-                    x_accel_raw, 
-                    y_accel_raw, 
-                    z_accel_raw)
+        #The orientation is only fused once - The degree values are worked out from the radians
+        #the same way the Sense Hat does it (0 to 360), and get_orientation() is the same as the degrees
+        orientation_rad = roll_pitch_yaw(sense.get_orientation_radians())
+        orientation_degrees = tuple(math.degrees(i) % 360 for i in orientation_rad)
+
+        compass_raw = xyz(sense.get_compass_raw())
+        gyro_only = roll_pitch_yaw(sense.get_gyroscope())
+        gyro_raw = xyz(sense.get_gyroscope_raw())
+        accel_only = roll_pitch_yaw(sense.get_accelerometer())
+        accel_raw = xyz(sense.get_accelerometer_raw())
+
+        calculations = ((datetime_now, day, lontitude, latitude, photo_num, temperature, humidity, pressure)
+                        + orientation_rad
+                        + orientation_degrees
+                        + orientation_degrees
+                        + compass_raw
+                        + gyro_only
+                        + gyro_raw
+                        + accel_only
+                        + accel_raw)
 
     #If the Sense Hat fails to calculate the data the CSV file will be filled with 0
     #Hence, the program won't crash and the error will be visible.
-    except Exception as e:
-        logger.error('{}: {})'.format(e.__class__.__name__, e))
-        logger.error("Error: " + str(e))
+    except Exception:
+        logger.exception("Could not collect the Sense Hat data")
 
-        calculations = (datetime_now, day, lontitude, latitude, photo_num, temperature, 0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0)
+        calculations = (datetime_now, day, lontitude, latitude, photo_num, temperature) + (0,) * 26
 
     return calculations
    
@@ -279,45 +323,73 @@ def create_csv_file(data_file):
                   
         writer.writerow(labels)
 
-def add_csv_data(data_file, data):
+def add_csv_data(data):
     '''
     Adds data to the CSV file
+
+    The file is kept open for the whole run and the rows are written in batches,
+    so the SD card isn't hit with an open / close for every photo.
     '''
+    csv_batch.append(data)
 
-    #Makes sure to always open / close the file
-    with open(data_file, 'a') as file:
-        writer = csv.writer(file)
-        writer.writerow(data)
+    if len(csv_batch) >= csv_batch_rows:
+        flush_csv_data()
+
+def flush_csv_data():
+    '''
+    Writes the rows waiting in csv_batch to the CSV file
+    '''
+    csv_writer.writerows(csv_batch)
+    csv_file.flush()
+    csv_batch.clear()
 
 #######################
 
 #Start counting the duration of the program
 start = datetime.now()
+start_monotonic = time.monotonic()
+
+#Difference between local time and UTC - Lets the loop read the clock only once
+utc_offset = timedelta(seconds=round((start - datetime.utcnow()).total_seconds()))
 
 #Path of the file in which data is stored
 path = os.path.dirname(os.path.realpath(__file__))
 
+#Names of the photo files - Worked out once at the start
+#A photo is taken at most every 5 seconds for 178 minutes
+photo_files = [path + "/image_" + str(i).zfill(3) + ".jpg" for i in range(178 * 60 // 5 + 1)]
+
 #Name of the CSV data file
 data_file = path + "/spacekludgers.csv"
 create_csv_file(data_file)
 
+#Keeps the CSV file open for the whole run - Closed automatically when the program exits
+csv_file = open(data_file, 'a', newline='', buffering=65536)
+csv_writer = csv.writer(csv_file)
+atexit.register(csv_file.close)
+
+#Rows waiting to be written / How many rows are written to the SD card at once
+#The last rows are written when the program exits
+csv_batch = []
+csv_batch_rows = 16
+atexit.register(flush_csv_data)
+
 #Name of the log file - Shows details about the program while it's running
-logzero.logfile(path + "/spacekludgers.log")
 formatter = logging.Formatter('%(name)s - %(asctime)-15s - %(levelname)s: %(message)s');
 logzero.formatter(formatter)
 
+#The log messages are kept in memory and written to the file every 100 messages,
+#straight away if there is an error, and when the program exits
+log_file = logging.FileHandler(path + "/spacekludgers.log")
+log_file.setFormatter(formatter)
+logger.addHandler(logging.handlers.MemoryHandler(capacity=100, flushLevel=logging.ERROR, target=log_file))
+
 #Connect to the Sense HAT
 sense = SenseHat()
 
-#Find location of ISS 
-name = "ISS (ZARYA)"
-line1 = "1 25544U 98067A   20041.35648148  .00000452  00000-0  16324-4 0  9997"
-line2 = "2 25544  51.6446 260.9599 0004888 249.2039  92.3149 15.49151626212198"
-
-iss = ephem.readtle(name, line1, line2)
-
-#Variable to check if it's day or night
-day = False
+#Reads the Sense Hat in the background while the photo is being queued / captured
+#Only one worker, so two reads never talk to the Sense Hat at the same time
+sense_pool = ThreadPoolExecutor(max_workers=1)
 
 #Connect to the camera - Set resolution
 camera = PiCamera() 
@@ -325,69 +397,116 @@ res1 = 2592
 res2 = 1944
 camera.resolution = (res1, res2)
 
-#Photo number / Gives different names to the images
-photo_num = 0 
+#GPS exif tags of the next photo - Copied into each capture job
+photo_exif_tags = {}
+
+#Photos waiting to be captured by Izzy's camera in the background thread
+capture_queue = queue.Queue(maxsize=2)
+capture_thread = threading.Thread(target=capture_photos, daemon=True)
+capture_thread.start()
+
+#Horizon altitude (in degrees) used by is_the_sun_up
+sun_horizon = -0.34
 
-#Second variable to check the duration of the program 
-now = datetime.now()
+#Last day / night answer of is_the_sun_up, when it was calculated and the altitude of the Sun at the time
+last_day_check = None
+last_day = False
+last_sun_altitude = 0
 
-#Saves info to the log file
-logger.info("Starting Space kludgers job at: %s", start)
+def main():
+    '''
+    Runs the experiment until the end time, taking a photo and saving the Sense Hat data on every loop.
+    The loop lives in a function so its variables are locals instead of module globals.
+    '''
+    #Find location of ISS 
+    name = "ISS (ZARYA)"
+    line1 = "1 25544U 98067A   20041.35648148  .00000452  00000-0  16324-4 0  9997"
+    line2 = "2 25544  51.6446 260.9599 0004888 249.2039  92.3149 15.49151626212198"
 
-#Time when the program is supposed to exit 
-#Runs for 178 minutes, 2 minutes before the expected end of the program 
-endtime = start + timedelta(minutes=178)
+    iss = ephem.readtle(name, line1, line2)
 
-#Run program until calculated endtime
-while (now < endtime):
+    #Variable to check if it's day or night
+    day = False
 
-    try:
-        #Gets the coordinates of ISS
-        iss.compute()
+    #Photo number / Gives different names to the images
+    photo_num = 0 
+
+    #Saves info to the log file
+    logger.info("Starting Space kludgers job at: %s", start)
 
-        #Longtitude & latitude in degrees
-        lontitude = iss.sublong / degree
-        latitude = iss.sublat / degree
+    #Time when the program is supposed to exit 
+    #Runs for 178 minutes, 2 minutes before the expected end of the program 
+    #Uses the monotonic clock, so the duration isn't affected if the system clock is adjusted
+    endtime = start_monotonic + 178 * 60
 
-        #Saves info to the log file
-        logger.info("ISS at %s is at Lontitude: %s Latitude: %s", now, lontitude, latitude)
+    #Run program until calculated endtime
+    while (time.monotonic() < endtime):
 
-        #Input for is_the_sun_up function
-        lontitude_str = str(lontitude)
-        latitude_str = str(latitude)
-        time = datetime.utcnow() 
+        #Date / time of this loop for the log and CSV files
+        now = datetime.now()
 
-        #Calculates if it's day or night
-        day = is_the_sun_up(lontitude_str, latitude_str, time)
+        #Each step has its own error handling, so that one failing doesn't stop the others
+        #and the program only waits a moment before trying again
+        try:
+            #Gets the coordinates of ISS
+            iss.compute()
+            sublong = iss.sublong
+            sublat = iss.sublat
 
-        #Saves info to the log file
-        logger.info("ISS is in day = %s", day)
+            #Longtitude & latitude in degrees
+            lontitude = sublong / degree
+            latitude = sublat / degree
 
-        #Calculates and writes the metadata to add them to the photo details
-        write_photo_metadata()
-        
-        # save photo using current number
-        write_photo(photo_num)
+            #Saves info to the log file
+            logger.info("ISS at %s is at Lontitude: %s Latitude: %s", now, lontitude, latitude)
 
-        #Calculates data and adds them to the CSV file
-        data_from_sensehat = collect_sensehat_data(now, day, lontitude, latitude, photo_num)
-        add_csv_data(data_file, data_from_sensehat)
- 
-        #Makes the program wait for a few seconds before capturing another photo.
-        photo_capture_delay(day)
+            #Calculates if it's day or night
+            day = is_the_sun_up(latitude, lontitude, now - utc_offset)
+
+            #Saves info to the log file
+            logger.info("ISS is in day = %s", day)
+
+        #Without the position of ISS there is nothing to save - Tries again on the next loop
+        except Exception:
+            logger.exception("Could not calculate the position of ISS")
+            sleep(0.5)
 
-    #Helps the program to keep running if an error occurs - States the error
-    except Exception as e:
-        logger.error('{}: {})'.format(e.__class__.__name__, e))
-        logger.error("Error: " + str(e))
-        sleep(5)
+        else:
+            #Starts collecting the Sense Hat data while the photo is taken
+            future_sensehat = sense_pool.submit(collect_sensehat_data, now, day, lontitude, latitude, photo_num)
+
+            #Calculates and writes the metadata to add them to the photo details
+            write_photo_metadata(sublong, sublat)
+
+            try:
+                # save photo using current number
+                write_photo(photo_num)
+
+            except Exception:
+                logger.exception("Could not queue photo number %s", photo_num)
+
+            #Time of the next photo - The rest of the work is done while waiting for it
+            next_photo = time.monotonic() + photo_capture_delay(day)
+
+            try:
+                #Waits for the Sense Hat data and adds them to the CSV file
+                #If the Sense Hat fails, collect_sensehat_data fills the row with 0
+                data_from_sensehat = future_sensehat.result()
+                add_csv_data(data_from_sensehat)
+
+            except Exception:
+                logger.exception("Could not add the Sense Hat data to the CSV file")
+ 
+            #Makes the program wait for the rest of the time before capturing another photo.
+            sleep(max(0, next_photo - time.monotonic()))
 
-    #Gives a diffrent name to the next photo
-    photo_num = photo_num + 1 
-        
-    #Change value in order to update the duration of the program
-    now = datetime.now()
+        #Gives a diffrent name to the next photo
+        photo_num = photo_num + 1 
 
-logger.info("Succesfully completed Space kludgers ISS Job at %s ", now)
+    #Waits for the last photos to be captured
+    capture_queue.join()
+    sense_pool.shutdown()
 
+    logger.info("Succesfully completed Space kludgers ISS Job at %s ", datetime.now())
 
+main()